@@ -8,71 +8,90 @@
 __author__ = "\n".join(["James Clough (james.clough91@gmail.com)"])
 
 import numpy as np
+from scipy.sparse import csr_matrix
 
 def causet_adj_matrix(S, R):
     """ Return causal set adjacency matrix A
     
         S: separations
         R: original coordinates"""
-    N = S.shape[0]
-    A = np.zeros((N, N))
-    for i in range(N):
-        for j in range(N):
-            # check time ordering - A[i,j] is 1 if i is in the future of j
-            if R[i,0] > R[j,0]:
-                if S[i,j] < 0:
-                    A[i,j] = 1.
+    # check time ordering - A[i,j] is 1 if i is in the future of j
+    t = R[:, 0]
+    A = ((t[:, None] > t[None, :]) & (S < 0)).astype(np.float64)
     return A  
     
+def _bool_dot(A, B):
+    """ Return the boolean (OR-AND) matrix product of A and B
+    
+    np.dot on bool arrays does not use BLAS, so multiply as float32 with
+    the cache-blocked BLAS routine and keep the nonzero entries"""
+    return np.dot(A.astype(np.float32), B.astype(np.float32)) > 0
+
 def transitive_completion(A_):
     """ Transitively complete adjacency matrix A"""
-    A = A_[:,:]
-    A_0 = A[:,:]
+    A = np.ascontiguousarray(A_ != 0, dtype=np.float32)
+    A_next = np.empty_like(A)
     N, _ = A.shape
+    n_edges = np.count_nonzero(A)
     A_diff = True
     i = 0
     while A_diff:
-        A_old = A[:,:]
-        A = np.dot(A, A_0)
-        A += A_0
-        A[A>1.] = 1.
-        if np.array_equal(A_old, A):
+        # squaring doubles the length of paths covered - log2(N) steps
+        np.dot(A, A, out=A_next)
+        A_next += A
+        np.minimum(A_next, 1., out=A_next)
+        A, A_next = A_next, A
+        # edges are only ever added, so an unchanged count means converged
+        n_edges_old, n_edges = n_edges, np.count_nonzero(A)
+        if n_edges == n_edges_old:
             A_diff = False
         assert i < N, 'ERROR - Transitive Completion required more than N steps'
         i += 1
-    return A
+    return A.astype(float)
     
 def transitive_reduction(A_, LP=None):
     """ Transitively reduce adjacency matrix A
    
-    plan is to look at successive powers of A and if an element is 1 in both
-    then it represents an edge which is transitively implied
-    we need to do this |LP| times - 
-       - could do it N times to be sure (start here)
-       - could compute |LP| but that might be slower
-       - could allow |LP| as optional input incase it is already calculated
+    an edge is transitively implied if there is also a path of length 2 or
+    more between its ends, and those paths are the nonzero elements of
+    A times the transitive completion of A
+       - if |LP| is given and is at most 2 then A times A is enough
    """
-    A = A_[:,:]
-    A_0 = A[:,:]
-    N, _ = A.shape
-    if LP:
-        max_path = LP
+    A = A_.astype(bool)
+    if LP and LP <= 2:
+        implied = _bool_dot(A, A)
     else:
-        max_path = N
-    i = 0
-    while i < max_path:
-        A = np.dot(A, A_0)
-        A = A_0 - A
-        A[A<1] = 0
-        A[A>1] = 1
-        i += 1
-    return A
+        implied = _bool_dot(A, transitive_completion(A))
+    return (A & ~implied).astype(float)
+
+def _topo_order(A):
+    """ Return the nodes of the DAG with adjacency matrix A in topological order
+    
+    Kahn's algorithm, removing all nodes with no remaining parents at once
+    A should be a scipy.sparse CSR matrix"""
+    N = A.shape[0]
+    in_degree = np.bincount(A.indices, minlength=N)
+    done = np.zeros(N, dtype=bool)
+    order = []
+    while len(order) < N:
+        ready = np.flatnonzero((in_degree == 0) & ~done)
+        assert ready.size > 0, 'ERROR - adjacency matrix contains a cycle'
+        done[ready] = True
+        in_degree -= np.bincount(A[ready].indices, minlength=N)
+        order.extend(ready)
+    return order
+
+def _path_dtype(N):
+    """ Return the smallest integer dtype that holds path lengths in N nodes"""
+    if N < np.iinfo(np.int16).max:
+        return np.int16
+    return np.int32
 
 def longest_path_matrix(A, dmax=None):
     """ Calculate all longest paths and return them in a matrix
     
     Arguments:
-    A -- adjacency matrix
+    A -- adjacency matrix, dense or scipy.sparse
     dmax -- maximum path length to be returned
     
     Result should be an NxN assymetric matrix of longest paths
@@ -81,6 +100,8 @@ def longest_path_matrix(A, dmax=None):
     JC - I believe this scales like N**3
          Finding one longest path can be done in linear time
          And we need to find N**2 of them so this is reasonable
+         A single sweep in topological order fills in each column from
+         the columns of its parents, so this is O(N(N+E))
         
     JC - The longest path is conjectured to approximate the geodesic in 
          Lorentzian spacetimes but this is not proven to my knowledge 
@@ -88,19 +109,35 @@ def longest_path_matrix(A, dmax=None):
     N = A.shape[0]
     if dmax is None:
         dmax = N
-    LP = np.zeros((N, N))
-    i = 1
-    B = A[:,:]
-    while np.sum(B) > 0.:
-        path_exist = np.sign(B)
-        path_length = i * path_exist
-        LP = np.maximum.reduce((LP, path_length))
-        B = np.dot(B, A)
-        i += 1
-        if i == dmax:
-            return LP
+    # lengths are small integers, so sweep over a compact integer matrix
+    # and only widen to float at the end
+    # columns are filled one at a time, so store them contiguously
+    lp_len = np.zeros((N, N), dtype=_path_dtype(N), order='F')
+    # causet adjacency matrices are sparse, so keep A in CSR/CSC form and
+    # read the parents of each node straight from the CSC column
+    A_s = csr_matrix(A > 0)
+    A_c = A_s.tocsc()
+    for v in _topo_order(A_s):
+        parents = A_c.indices[A_c.indptr[v]:A_c.indptr[v+1]]
+        if parents.size == 0:
+            continue
+        # every path ending at a parent u extends by one edge to v,
+        # and the edge u->v itself is a path of length 1
+        paths = lp_len[:, parents]
+        np.add(paths, 1, out=paths, where=paths > 0)
+        paths[parents, np.arange(parents.size)] = 1
+        np.max(paths, axis=1, out=lp_len[:, v])
+    LP = lp_len.astype(float, order='C')
+    np.minimum(LP, dmax, out=LP)
     return LP
     
+def _min_nonzero_lp(LP, w_list, z_list, dmax):
+    """ Return the min non-zero LP from any w in w_list to any z in z_list
+    
+    Returns dmax if it is smaller, or if there is no path at all"""
+    sub = LP[np.ix_(w_list, z_list)]
+    return np.where(sub > 0, sub, dmax).min(initial=dmax)
+
 def naive_spacelike_matrix(LP, dmax=None, k=None):  
     """ Calculate all naive spacelike distances and return them in a matrix
     
@@ -118,35 +155,35 @@ def naive_spacelike_matrix(LP, dmax=None, k=None):
     """
     if dmax == None:
         dmax = np.max(LP)
-    ds = LP + LP.transpose()
-    ds2 = ds * ds * -1
+    LP = np.ascontiguousarray(LP)
+    # ds2 = -(LP + LP.T)**2, built in place in a single buffer
+    ds2 = np.add(LP, LP.transpose())
+    np.square(ds2, out=ds2)
+    np.negative(ds2, out=ds2)
     N = LP.shape[0]
-    for i in range(N):
-        max_j = i
-        if k:
-            max_j = np.min([i, k])
-        for j in range(max_j):
-            # spacelike distance is symmetric so ds[i,j]==ds[j,i], and ds[i,i]==0
-            if ds2[i,j] == 0:
-                # then they are spacelike separated and need a new value here
-                i_past = np.flatnonzero(LP[:,i])
-                j_past = np.flatnonzero(LP[:,j])
-                w_list = np.intersect1d(i_past, j_past)
-
-                i_future = np.flatnonzero(LP[i,:])
-                j_future = np.flatnonzero(LP[j,:])
-                z_list = np.intersect1d(i_future, j_future)
-                if (len(z_list)>0) and (len(w_list)>0):
-                    # find min non-zero LP from w to z
-                    sp_dist = dmax
-                    for w in w_list:
-                        for z in z_list:
-                            w_z = LP[w, z]
-                            if w_z > 0:
-                                sp_dist = min(sp_dist, w_z)
-                else:
-                    sp_dist = dmax
-                    
-                ds2[i,j] = sp_dist * sp_dist
-                ds2[j,i] = sp_dist * sp_dist
+    # row i of these is the past/future of i packed into bits, shared by all
+    # pairs, so the common past/future of a pair is one AND over N/8 bytes
+    past_bits = np.packbits(LP.transpose() > 0, axis=1)
+    future_bits = np.packbits(LP > 0, axis=1)
+    # spacelike distance is symmetric so ds[i,j]==ds[j,i], and ds[i,i]==0
+    # so only visit the lower triangle, and only pairs with ds2[i,j]==0 as
+    # they are spacelike separated and need a new value here
+    mask = np.tril(ds2 == 0, -1)
+    if k:
+        mask[:, k:] = False
+    pairs = np.argwhere(mask)
+    sp_dist2 = np.empty(len(pairs))
+    for n, (i, j) in enumerate(pairs):
+        w_bits = past_bits[i] & past_bits[j]
+        z_bits = future_bits[i] & future_bits[j]
+        if z_bits.any() and w_bits.any():
+            w_list = np.flatnonzero(np.unpackbits(w_bits)[:N])
+            z_list = np.flatnonzero(np.unpackbits(z_bits)[:N])
+            sp_dist = _min_nonzero_lp(LP, w_list, z_list, dmax)
+        else:
+            sp_dist = dmax
+        sp_dist2[n] = sp_dist * sp_dist
+    # write both triangles in one go
+    ds2[pairs[:,0], pairs[:,1]] = sp_dist2
+    ds2[pairs[:,1], pairs[:,0]] = sp_dist2
     return ds2 
@@ -16,6 +16,98 @@ class TestLongestPathMatrix(object):
         A = nx.adjacency_matrix(G)
         A = A.toarray()
         LP = dag.longest_path_matrix(A)
+        assert_true(LP.flags['C_CONTIGUOUS'])
         for i in range(10):
             for j in range(10):
                 assert_equal(LP[i,j], max(j-i, 0))
+
+    def test_dmax(self):
+        G = nx.path_graph(10, create_using=nx.DiGraph())
+        A = nx.adjacency_matrix(G)
+        A = A.toarray()
+        LP = dag.longest_path_matrix(A, dmax=3)
+        for i in range(10):
+            for j in range(10):
+                assert_equal(LP[i,j], min(max(j-i, 0), 3))
+
+class TestTransitiveReduction(object):
+    """ Unit tests for transitive_reduction function"""
+
+    def test_shortcut(self):
+        G = nx.path_graph(5, create_using=nx.DiGraph())
+        G.add_edge(0, 4)
+        G.add_edge(1, 3)
+        A = nx.adjacency_matrix(G, range(5))
+        A = A.toarray()
+        TR = dag.transitive_reduction(A)
+        for i in range(5):
+            for j in range(5):
+                assert_equal(TR[i,j], float(j == i+1))
+
+class TestTransitiveCompletion(object):
+    """ Unit tests for transitive_completion function"""
+
+    def test_line(self):
+        G = nx.path_graph(10, create_using=nx.DiGraph())
+        A = nx.adjacency_matrix(G)
+        A = A.toarray()
+        A_copy = A.copy()
+        TC = dag.transitive_completion(A)
+        assert_true(np.array_equal(A, A_copy))
+        for i in range(10):
+            for j in range(10):
+                assert_equal(TC[i,j], float(j > i))
+
+    def test_memory_layout(self):
+        G = nx.path_graph(10, create_using=nx.DiGraph())
+        A = nx.adjacency_matrix(G)
+        A = A.toarray()
+        # a transposed view is Fortran-ordered, so check both orders
+        TC = dag.transitive_completion(A.T)
+        TC_F = dag.transitive_completion(np.asfortranarray(A))
+        for i in range(10):
+            for j in range(10):
+                assert_equal(TC[i,j], float(j < i))
+                assert_equal(TC_F[i,j], float(j > i))
+
+class TestNaiveSpacelikeMatrix(object):
+    """ Unit tests for naive_spacelike_matrix function"""
+
+    def setup(self):
+        # 1 and 2 are spacelike with common past {0} and common future
+        # {3, 5, 6}, 4 has no future so has no common future with anything
+        G = nx.DiGraph([(0, 1), (0, 2), (0, 4), (1, 3), (2, 3), (3, 5), (5, 6)])
+        A = nx.adjacency_matrix(G, range(7))
+        A = A.toarray()
+        self.LP = dag.longest_path_matrix(A)
+
+    def test_common_past_and_future(self):
+        ds2 = dag.naive_spacelike_matrix(self.LP)
+        # shortest of the longest paths from 0 to {3, 5, 6} is 0->3
+        assert_equal(ds2[1,2], 4.)
+        assert_equal(ds2[2,1], 4.)
+        assert_equal(ds2[0,6], -16.)
+        assert_equal(ds2[1,3], -1.)
+
+    def test_no_common_future(self):
+        # dmax defaults to the longest path, 0->6
+        ds2 = dag.naive_spacelike_matrix(self.LP)
+        for j in [1, 2, 3, 5, 6]:
+            assert_equal(ds2[4,j], 16.)
+            assert_equal(ds2[j,4], 16.)
+
+    def test_landmarks(self):
+        ds2 = dag.naive_spacelike_matrix(self.LP, k=2)
+        assert_equal(ds2[1,2], 4.)
+        assert_equal(ds2[4,1], 16.)
+        assert_equal(ds2[1,4], 16.)
+        # pairs with neither point among the first k are left as 0
+        for j in [2, 3, 5, 6]:
+            assert_equal(ds2[4,j], 0.)
+            assert_equal(ds2[j,4], 0.)
+
+    def test_dmax(self):
+        ds2 = dag.naive_spacelike_matrix(self.LP, dmax=1.)
+        assert_equal(ds2[1,2], 1.)
+        assert_equal(ds2[4,1], 1.)
+        assert_equal(ds2[0,6], -16.)